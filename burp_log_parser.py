@@ -6,166 +6,389 @@ This script parses a Burp Suite log file (in XML or CSV format), decodes base64-
 and prints them in a human-readable format with colored output for better readability.
 
 Usage:
-    python burp_log_parser.py <input_file> --status_code <status_code> --filter_response <filter_response> --negative_filter_response <negative_filter_response> --response_only --json_output
+    python burp_log_parser.py <input_file> --status_code <status_code> --filter_response <filter_response> --negative_filter_response <negative_filter_response> --response_only --json_output --workers <workers>
 
 Dependencies:
     - termcolor: Install using `pip install termcolor`
+    - pybase64 (optional): Install using `pip install pybase64` for SIMD-accelerated base64 decoding
+    - google-re2 (optional): Install using `pip install google-re2` for linear-time response filtering
 
 """
 
 import csv
-import base64
+import binascii
 import argparse
+import contextlib
+import itertools
 import re
 import json
+import os
 import sys
 import xml.etree.ElementTree as ET
-from termcolor import colored
-
-def parse_xml(file_path):
-    """Parses a Burp Suite XML log file."""
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    log_entries = []
-    for i, item in enumerate(root.findall('item')):
-        log_entry = {
-            "ID": str(i),
-            "Time": item.find('time').text,
-            "Tool": "Burp Suite",
-            "Method": item.find('method').text,
-            "Protocol": item.find('protocol').text,
-            "Host": item.find('host').text,
-            "Port": item.find('port').text,
-            "URL": item.find('url').text,
-            "Status code": item.find('status').text,
-            "Length": item.find('responselength').text,
-            "MIME type": item.find('mimetype').text,
-            "Comment": item.find('comment').text,
-            "Request": item.find('request').text if item.find('request') is not None else None,
-            "Response": item.find('response').text if item.find('response') is not None else None,
-        }
-        log_entries.append(log_entry)
-    return log_entries
-
-def parse_csv(file_path):
-    """Parses a Burp Suite CSV log file."""
-    log_entries = []
-    with open(file_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            log_entries.append(row)
-    return log_entries
-
-def decode_burp_log(file_path, filter_status_code, filter_response, negative_filter_response, response_only, json_output):
-    log_entries = []
+from concurrent.futures import ProcessPoolExecutor
+import termcolor
 
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Largest CSV field accepted; big enough for base64-encoded bodies while still stopping runaway fields in malformed files
+CSV_FIELD_SIZE_LIMIT = 10 * 1024 * 1024
+csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
+
+# Only colorize output for terminals, following the NO_COLOR/FORCE_COLOR conventions
+USE_COLOR = 'FORCE_COLOR' in os.environ or (sys.stdout.isatty() and 'NO_COLOR' not in os.environ)
+
+def plain(text, color):
+    """Returns the text as-is; stands in for termcolor.colored when output is not colorized."""
+    return text
+
+colored = termcolor.colored if USE_COLOR else plain
+
+# Number of entries sent to a worker process at a time when decoding with several workers
+WORKER_CHUNKSIZE = 256
+
+# Fields of a parsed log entry, in output order; both parsers fill in exactly these fields
+ENTRY_FIELDS = ['ID', 'Time', 'Tool', 'Method', 'Protocol', 'Host', 'Port', 'URL',
+                'Status Code', 'Length', 'MIME Type', 'Comment', 'Request', 'Response']
+
+# Burp XML item elements and the entry fields they are stored in
+XML_FIELD_NAMES = {
+    'time': 'Time',
+    'method': 'Method',
+    'protocol': 'Protocol',
+    'host': 'Host',
+    'port': 'Port',
+    'url': 'URL',
+    'status': 'Status Code',
+    'responselength': 'Length',
+    'mimetype': 'MIME Type',
+    'comment': 'Comment',
+    'request': 'Request',
+    'response': 'Response',
+}
+
+# Burp CSV columns whose names differ from the field names used for entries and output
+CSV_FIELD_NAMES = {'Status code': 'Status Code', 'MIME type': 'MIME Type'}
+
+# Escapes that are Unicode-aware in Python's re module but ASCII-only in re2
+ASCII_ONLY_IN_RE2 = re.compile(r'\\[wWbBdDsS]')
+
+# Characters with a special meaning in a regex; patterns without them are matched as plain substrings
+REGEX_SPECIAL_CHARS = re.compile(rb'[.^$*+?{}\[\]\\|()]')
+
+def parse_xml(file_path, filter_status_code=None):
+    """Parses a Burp Suite XML log file, yielding one entry per item with a matching status code."""
+    # Every entry starts out with all fields so that missing elements come out as None
+    entry_template = dict(dict.fromkeys(ENTRY_FIELDS), Tool="Burp Suite")
+    # Read through a large buffer so the parser's small reads rarely hit the file system
+    with open(file_path, 'rb', buffering=1 << 20) as xmlfile:
+        # Stream the document and drop each <item> once it has been read so memory stays flat on large logs
+        context = ET.iterparse(xmlfile, events=('start', 'end'))
+        _, root = next(context)
+        i = -1
+        for event, item in context:
+            if event != 'end' or item.tag != 'item':
+                continue
+            i += 1
+            # Skip items with another status code before extracting any fields
+            if filter_status_code and item.findtext('status') != filter_status_code:
+                root.clear()
+                continue
+            # Fill in the entry in a single pass over the item's children instead of one find() per field
+            log_entry = dict(entry_template, ID=str(i))
+            log_entry.update((XML_FIELD_NAMES[child.tag], child.text) for child in item if child.tag in XML_FIELD_NAMES)
+            # Drop the item's children before handing the entry out, so the entry holds the only reference to the bodies
+            item.clear()
+            yield log_entry
+            root.clear()
+
+def parse_csv(file_path, filter_status_code=None):
+    """Parses a Burp Suite CSV log file, yielding one entry per row with a matching status code."""
+    with open(file_path, newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        # Rename Burp's CSV columns to the output field names once instead of remapping every row
+        header = [CSV_FIELD_NAMES.get(name, name) for name in header]
+        # Only known columns are kept, and every entry starts out with all fields so missing columns come out as None
+        entry_template = dict.fromkeys(ENTRY_FIELDS)
+        columns = [(index, name) for index, name in enumerate(header) if name in entry_template]
+        # Look the status code column up once so skipped rows are never turned into dicts
+        status_index = header.index('Status Code') if 'Status Code' in header else len(header)
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # Skip rows with oversized fields instead of aborting the whole parse
+                print(f"Skipping CSV row at line {reader.line_num}: {e}", file=sys.stderr)
+                continue
+            if not values:
+                continue
+            if filter_status_code and (values[status_index] if status_index < len(values) else None) != filter_status_code:
+                continue
+            log_entry = dict(entry_template)
+            for index, name in columns:
+                if index < len(values):
+                    log_entry[name] = values[index]
+            # Drop the row before handing the entry out, so the entry holds the only reference to the bodies
+            del values
+            yield log_entry
+
+def iter_entries(entries):
+    """Yields parsed log entries, exiting with an error if the log cannot be parsed."""
+    try:
+        yield from entries
+    except Exception as e:
+        print(f"Error parsing file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def is_xml_file(file_path):
+    """Detects an XML log by its extension, only sniffing the start of the file if the extension is unknown."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.xml':
+        return True
+    if extension == '.csv':
+        return False
+    with open(file_path, 'rb') as f:
+        return b'<?xml' in f.read(100)
+
+def decode_base64(data):
+    """Decodes base64-encoded request/response data to bytes, keeping the data as-is if it is not base64 encoded."""
+    try:
+        return base64.b64decode(data, validate=False)
+    except (binascii.Error, TypeError):
+        return data.encode('utf-8')
+
+def split_patterns(patterns):
+    """Splits a comma-separated list of text/regex patterns into unique, non-empty UTF-8 encoded patterns."""
+    return list(dict.fromkeys(pattern.strip().encode('utf-8') for pattern in patterns.split(',') if pattern.strip()))
+
+def is_literal(pattern):
+    """Tells whether a pattern contains no regex syntax and can be matched as a plain substring."""
+    return not REGEX_SPECIAL_CHARS.search(pattern)
+
+def compile_filter(patterns):
+    """
+    Compiles a comma-separated list of text/regex patterns into a function that tells whether any of them matches
+    a response body given as bytes.
+
+    Plain text patterns are UTF-8 encoded and matched against the raw bytes with a substring search, so bodies that
+    only go through plain text filters are never decoded. Regex patterns are matched against the body decoded as UTF-8
+    text, so '.', character classes and \\w work on characters; bytes that are not valid UTF-8 are replaced with U+FFFD
+    so they can still be matched by '.'. Duplicate and empty patterns are dropped; returns None if no patterns are left.
+    """
+    if not patterns:
+        return None
+    patterns = split_patterns(patterns)
+    if not patterns:
+        return None
+    literals = [pattern for pattern in patterns if is_literal(pattern)]
+    regex_matches = compile_regex_filter([pattern.decode('utf-8') for pattern in patterns if not is_literal(pattern)])
+
+    if not regex_matches:
+        return lambda raw: any(literal in raw for literal in literals)
+    if not literals:
+        return lambda raw: regex_matches(raw.decode('utf-8', 'replace'))
+    return lambda raw: any(literal in raw for literal in literals) or regex_matches(raw.decode('utf-8', 'replace'))
+
+def compile_regex_filter(patterns):
+    """
+    Compiles a list of regex patterns into a function matching text, or returns None if the list is empty.
+
+    When google-re2 is installed all patterns are tested in a single linear-time pass with an re2 pattern set;
+    otherwise, or if a pattern uses syntax re2 does not support (e.g. backreferences) or classes such as \\w that
+    re2 only applies to ASCII, Python's re module is used.
+    Regexes are compiled so that '.' also matches newlines in multiline bodies.
+    """
+    if not patterns:
+        return None
+
+    if re2 is not None and not any(ASCII_ONLY_IN_RE2.search(pattern) for pattern in patterns):
+        options = re2.Options()
+        options.log_errors = False
+        options.dot_nl = True
+        pattern_set = re2.Set.SearchSet(options)
+        try:
+            for pattern in patterns:
+                pattern_set.Add(pattern)
+            pattern_set.Compile()
+        except re2.error:
+            pass
+        else:
+            return lambda text: bool(pattern_set.Match(text))
+
+    compiled = [re.compile(pattern, re.DOTALL) for pattern in patterns]
+    return lambda text: any(pattern.search(text) for pattern in compiled)
+
+# Filters and output options for decode_entry(), set by init_decoder()
+decoder_settings = {}
+
+def init_decoder(filter_response, negative_filter_response, response_only, json_output):
+    """
+    Sets up the filters and output options used by decode_entry().
+
+    Called once in the main process, or once in each worker process, so compiled patterns never need to be pickled.
+    """
+    filter_matches = compile_filter(filter_response)
+    negative_filter_matches = compile_filter(negative_filter_response)
+    decoder_settings.update(
+        filter_matches=filter_matches,
+        negative_filter_matches=negative_filter_matches,
+        # Literal-only negative filters are cheap, so check them before the (possibly regex) positive filter
+        negative_filter_first=negative_filter_matches is not None and all(map(is_literal, split_patterns(negative_filter_response))),
+        response_only=response_only,
+        json_output=json_output,
+    )
+
+def decode_entry(row):
+    """
+    Decodes and filters a single log entry, returning its output text (or JSON object) or None if it is skipped.
+
+    The entry is consumed: its encoded Request/Response fields are removed as they are decoded.
+    """
+    response_only = decoder_settings['response_only']
+    filter_matches = decoder_settings['filter_matches']
+    negative_filter_matches = decoder_settings['negative_filter_matches']
+    negative_filter_first = decoder_settings['negative_filter_first']
+
+    # Entries without a request are only shown in response-only mode, so skip them before decoding anything
+    if not response_only and not row.get('Request'):
+        return None
+
+    # Encoded bodies are taken out of the entry as they are decoded, and each intermediate copy is released as soon
+    # as it has been used, so at most two copies of a body are alive at once
+    response = None
+    encoded_response = row.pop('Response', None)
+    # Decode the base64-encoded HTTP response if it exists
+    if encoded_response:
+        raw_response = decode_base64(encoded_response)
+        del encoded_response
+
+        if negative_filter_first and negative_filter_matches(raw_response):
+            return None
+        # Filter based on response content if provided (supports both text and regex)
+        if filter_matches and not filter_matches(raw_response):
+            return None
+        # Filter out responses that match the negative filter (supports both text and regex)
+        if negative_filter_matches and not negative_filter_first and negative_filter_matches(raw_response):
+            return None
+
+        # Filters run on the raw bytes, so only responses that are kept get decoded to text
+        response = raw_response.decode('utf-8', 'ignore')
+        del raw_response
+
+    # If response_only flag is set, only print the response; the request is never decoded
+    if response_only:
+        return f"{colored(response, 'yellow')}\n\n\n" if response else "\n\n"
+
+    # Decode the base64-encoded HTTP request
+    decoded_request = decode_base64(row.pop('Request')).decode('utf-8', 'ignore')
+
+    # The parsed entry already uses the output field names, so add the decoded bodies to it for JSON
+    if decoder_settings['json_output']:
+        row["Decoded HTTP Request"] = decoded_request
+        row["Decoded HTTP Response"] = response
+        # One compact object per line; indenting roughly doubles the output size for large bodies
+        return json.dumps(row)
+
+    # Build the whole block for the HTTP request/response so it can be written at once
+    output = (
+        f"ID: {row.get('ID')}\n"
+        f"Time: {row.get('Time')}\n"
+        f"Tool: {row.get('Tool')}\n"
+        f"Method: {row.get('Method')}\n"
+        f"Protocol: {row.get('Protocol')}\n"
+        f"Host: {row.get('Host')}\n"
+        f"Port: {row.get('Port')}\n"
+        f"URL: {row.get('URL')}\n"
+        f"Status Code: {row.get('Status Code')}\n"
+        f"Length: {row.get('Length')}\n"
+        f"MIME Type: {row.get('MIME Type')}\n"
+        f"Comment: {row.get('Comment')}\n"
+        "\n\n"
+        f"{colored('Decoded HTTP Request:', 'cyan')}\n"
+        # The decoded HTTP request is shown in green
+        f"{colored(decoded_request, 'green')}\n"
+    )
+    # Add the decoded HTTP response in yellow if it exists
+    if response:
+        output += f"\n\n{colored('Decoded HTTP Response:', 'cyan')}\n{colored(response, 'yellow')}\n"
+    return output + "\n\n"
+
+def map_in_batches(executor, func, iterable, batch_size, chunksize):
+    """
+    Like executor.map(), but only submits batch_size items at a time so large logs are not read into memory up front.
+
+    The next batch is submitted before the results of the current one are yielded, keeping the workers busy.
+    Results are yielded in input order.
+    """
+    iterator = iter(iterable)
+    pending = None
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        results = executor.map(func, batch, chunksize=chunksize) if batch else None
+        if pending is not None:
+            yield from pending
+        if results is None:
+            return
+        pending = results
+
+def decode_burp_log(file_path, filter_status_code, filter_response, negative_filter_response, response_only, json_output, workers=1):
     # Detect file type and parse accordingly
     try:
-        if file_path.lower().endswith('.xml') or b'<?xml' in open(file_path, 'rb').read(100):
-            raw_entries = parse_xml(file_path)
+        if is_xml_file(file_path):
+            raw_entries = parse_xml(file_path, filter_status_code)
         else:
-            # Increase CSV field size limit to avoid field limit error
-            csv.field_size_limit(sys.maxsize)
-            raw_entries = parse_csv(file_path)
+            raw_entries = parse_csv(file_path, filter_status_code)
     except Exception as e:
         print(f"Error parsing file: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # JSON entries are written as they are decoded instead of being collected in memory; the array is only
+    # opened once the first entry arrives, so a log that fails to parse before any entry leaves stdout empty
+    first_entry = True
+    completed = False
 
-    for row in raw_entries:
-        # Filter based on status code if provided
-        if filter_status_code and row.get('Status code') != filter_status_code:
-            continue
+    # Entries are already filtered on status code by the parser; decoding and response filtering
+    # happen in decode_entry(), either in this process or spread over a pool of worker processes
+    decoder_args = (filter_response, negative_filter_response, response_only, json_output)
+    # Always set up the decoder here first, so invalid filter patterns fail with their own error before any worker starts
+    init_decoder(*decoder_args)
+    try:
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(workers, initializer=init_decoder, initargs=decoder_args))
+                outputs = map_in_batches(executor, decode_entry, iter_entries(raw_entries), workers * WORKER_CHUNKSIZE * 4, WORKER_CHUNKSIZE)
+            else:
+                outputs = map(decode_entry, iter_entries(raw_entries))
 
-        response = None
-        # Decode the base64-encoded HTTP response if it exists
-        if 'Response' in row and row['Response']:
-            try:
-                response = base64.b64decode(row['Response']).decode('utf-8', 'ignore')
-            except (base64.binascii.Error, TypeError):
-                response = row['Response'] # Assume not base64 encoded
-
-            # Filter based on response content if provided (supports both text and regex)
-            if filter_response:
-                filter_patterns = filter_response.split(',')
-                if not any(re.search(pattern.strip(), response) for pattern in filter_patterns):
-                    continue
-            # Filter out responses that match the negative filter (supports both text and regex)
-            if negative_filter_response:
-                negative_patterns = negative_filter_response.split(',')
-                if any(re.search(pattern.strip(), response) for pattern in negative_patterns):
+            for output in outputs:
+                if output is None:
                     continue
-
-        # If response_only flag is set, only print the response
-        if response_only:
-            if response:
-                print(colored(response, "yellow"))
-            print("\n")
-            continue
-
-        # Decode the base64-encoded HTTP request
-        if 'Request' not in row or not row['Request']:
-            continue
-        
-        try:
-            decoded_request = base64.b64decode(row['Request']).decode('utf-8', 'ignore')
-        except (base64.binascii.Error, TypeError):
-            decoded_request = row['Request'] # Assume not base64 encoded
-
-
-        # Collect data for JSON output
-        log_entry = {
-            "ID": row.get('ID'),
-            "Time": row.get('Time'),
-            "Tool": row.get('Tool'),
-            "Method": row.get('Method'),
-            "Protocol": row.get('Protocol'),
-            "Host": row.get('Host'),
-            "Port": row.get('Port'),
-            "URL": row.get('URL'),
-            "Status Code": row.get('Status code'),
-            "Length": row.get('Length'),
-            "MIME Type": row.get('MIME type'),
-            "Comment": row.get('Comment'),
-            "Decoded HTTP Request": decoded_request,
-            "Decoded HTTP Response": response
-        }
-        log_entries.append(log_entry)
-
-        # Skip printing if JSON output is selected
-        if json_output:
-            continue
-
-        # Print general information about the HTTP request/response
-        print(f"ID: {row.get('ID')}")
-        print(f"Time: {row.get('Time')}")
-        print(f"Tool: {row.get('Tool')}")
-        print(f"Method: {row.get('Method')}")
-        print(f"Protocol: {row.get('Protocol')}")
-        print(f"Host: {row.get('Host')}")
-        print(f"Port: {row.get('Port')}")
-        print(f"URL: {row.get('URL')}")
-        print(f"Status Code: {row.get('Status code')}")
-        print(f"Length: {row.get('Length')}")
-        print(f"MIME Type: {row.get('MIME type')}")
-        print(f"Comment: {row.get('Comment')}")
-        print("\n")
-        print(colored("Decoded HTTP Request:", "cyan"))
-        # Print the decoded HTTP request in green color
-        print(colored(decoded_request, "green"))
-
-        # Print the decoded HTTP response if it exists
-        if response:
-            print("\n")
-            print(colored("Decoded HTTP Response:", "cyan"))
-            # Print the decoded HTTP response in yellow color
-            print(colored(response, "yellow"))
-
-        print("\n")
-
-    # Print the output as JSON if the json_output flag is set
-    if json_output:
-        print(json.dumps(log_entries, indent=4))
+                if json_output:
+                    sys.stdout.write(('[\n' if first_entry else ',\n') + output)
+                    first_entry = False
+                else:
+                    sys.stdout.write(output)
+        completed = True
+    finally:
+        # Close the JSON array if the json_output flag is set; this also happens when parsing stops part way
+        # through the log, so the entries written so far are still valid JSON
+        if json_output and not first_entry:
+            sys.stdout.write('\n]\n')
+        elif json_output and completed:
+            sys.stdout.write('[\n]\n')
+        sys.stdout.flush()
 
 def main():
     # Set up argument parser to take input file, status code, and response filter from command line
@@ -176,10 +399,14 @@ def main():
     parser.add_argument('--negative_filter_response', type=str, help='Exclude results by HTTP response content (supports text and regex, multiple patterns separated by commas)', default=None)
     parser.add_argument('--response_only', action='store_true', help='Only print the HTTP response data')
     parser.add_argument('--json_output', action='store_true', help='Print the output as JSON')
+    parser.add_argument('--workers', type=int, help='Number of processes used to decode and filter entries', default=1)
     args = parser.parse_args()
 
+    # Output is written in large blocks, so let stdout buffer it instead of flushing on every line
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
     # Call the function to decode the Burp log with optional filters
-    decode_burp_log(args.input_file, args.status_code, args.filter_response, args.negative_filter_response, args.response_only, args.json_output)
+    decode_burp_log(args.input_file, args.status_code, args.filter_response, args.negative_filter_response, args.response_only, args.json_output, args.workers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
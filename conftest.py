@@ -131,9 +131,9 @@ Content-Type: application/json
 
 @pytest.fixture
 def mock_colored(monkeypatch):
-    """Mock the termcolor.colored function to return plain text"""
+    """Mock the colored function used by the parser to return plain text"""
     def _colored(text, color):
         return text
     
-    monkeypatch.setattr('termcolor.colored', _colored)
+    monkeypatch.setattr('burp_log_parser.colored', _colored)
     return _colored
@@ -10,6 +10,9 @@ import pytest
 import tempfile
 import json
 import base64
+import gc
+import importlib
+import re
 import xml.etree.ElementTree as ET
 from unittest.mock import patch, mock_open
 import sys
@@ -93,24 +96,101 @@ Hello, World!"""
 
     def test_parse_xml(self, xml_file):
         """Test parsing XML file"""
-        entries = burp_log_parser.parse_xml(xml_file)
+        entries = list(burp_log_parser.parse_xml(xml_file))
         
         assert len(entries) == 1
         assert entries[0]['Host'] == 'example.com'
         assert entries[0]['Method'] == 'GET'
-        assert entries[0]['Status code'] == '200'
+        assert entries[0]['Status Code'] == '200'
         assert entries[0]['URL'] == 'http://example.com/test'
 
+    def test_parse_xml_multiple_items(self, create_burp_xml_file):
+        """Test parsing an XML file with several items keeps order and IDs"""
+        xml_file = create_burp_xml_file([
+            {'host': f'host{i}.example.com', 'status': '200', 'request': 'GET / HTTP/1.1'}
+            for i in range(3)
+        ])
+        entries = list(burp_log_parser.parse_xml(xml_file))
+
+        assert [entry['ID'] for entry in entries] == ['0', '1', '2']
+        assert [entry['Host'] for entry in entries] == ['host0.example.com', 'host1.example.com', 'host2.example.com']
+        assert entries[0]['Response'] is None
+        os.unlink(xml_file)
+
+    def test_parse_xml_status_code_filter(self, create_burp_xml_file):
+        """Test that the XML parser skips items with another status code and keeps their IDs"""
+        xml_file = create_burp_xml_file([
+            {'host': 'a.example.com', 'status': '200'},
+            {'host': 'b.example.com', 'status': '500'},
+            {'host': 'c.example.com'},
+        ])
+        entries = list(burp_log_parser.parse_xml(xml_file, '500'))
+        os.unlink(xml_file)
+
+        assert len(entries) == 1
+        assert entries[0]['ID'] == '1'
+        assert entries[0]['Host'] == 'b.example.com'
+
     def test_parse_csv(self, csv_file):
         """Test parsing CSV file"""
-        entries = burp_log_parser.parse_csv(csv_file)
+        entries = list(burp_log_parser.parse_csv(csv_file))
         
         assert len(entries) == 1
         assert entries[0]['Host'] == 'example.com'
         assert entries[0]['Method'] == 'GET'
-        assert entries[0]['Status code'] == '200'
+        assert entries[0]['Status Code'] == '200'
         assert entries[0]['URL'] == 'http://example.com/test'
 
+        assert list(burp_log_parser.parse_csv(csv_file, '404')) == []
+
+    def test_parse_csv_blank_and_short_rows(self):
+        """Test that blank lines are skipped and missing trailing columns are absent"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write('ID,Host,Status code,Request\n0,a.example.com,200,R0=\n\n1,b.example.com\n')
+        try:
+            entries = list(burp_log_parser.parse_csv(f.name))
+            assert [entry['Host'] for entry in entries] == ['a.example.com', 'b.example.com']
+            assert entries[1].get('Request') is None
+            assert [entry['ID'] for entry in burp_log_parser.parse_csv(f.name, '200')] == ['0']
+        finally:
+            os.unlink(f.name)
+
+    def test_parse_csv_oversized_field(self, capsys):
+        """Test that rows with a field over the size limit are skipped with a warning"""
+        old_limit = burp_log_parser.csv.field_size_limit(16)
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write('ID,Host\n0,a.example.com\n1,' + 'x' * 32 + '\n2,c.example.com\n')
+        try:
+            entries = list(burp_log_parser.parse_csv(f.name))
+        finally:
+            burp_log_parser.csv.field_size_limit(old_limit)
+            os.unlink(f.name)
+
+        assert [entry['ID'] for entry in entries] == ['0', '2']
+        assert "Skipping CSV row" in capsys.readouterr().err
+
+    def test_parsers_release_bodies(self, xml_file, csv_file):
+        """Test that a yielded entry holds the only reference to its encoded bodies"""
+        for entries in (burp_log_parser.parse_xml(xml_file), burp_log_parser.parse_csv(csv_file)):
+            entry = next(entries)
+            # The entry dict only holds strings, so the garbage collector does not track it and no referrer is left
+            assert gc.get_referrers(entry['Request']) == []
+            assert gc.get_referrers(entry['Response']) == []
+            entries.close()
+
+    def test_is_xml_file(self, sample_xml_content, sample_csv_content):
+        """Test file type detection by extension and by content"""
+        assert burp_log_parser.is_xml_file('/nonexistent/log.XML')
+        assert not burp_log_parser.is_xml_file('/nonexistent/log.csv')
+
+        for content, expected in ((sample_xml_content, True), (sample_csv_content, False)):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.log', delete=False) as f:
+                f.write(content)
+            try:
+                assert burp_log_parser.is_xml_file(f.name) is expected
+            finally:
+                os.unlink(f.name)
+
     def test_decode_base64_request_response(self, csv_file, capsys):
         """Test base64 decoding of requests and responses"""
         burp_log_parser.decode_burp_log(csv_file, None, None, None, False, False)
@@ -121,6 +201,19 @@ Hello, World!"""
         assert "HTTP/1.1 200 OK" in captured.out
         assert "Hello, World!" in captured.out
 
+    def test_non_base64_request_response(self, create_burp_csv_file, capsys):
+        """Test that request/response data which is not base64 encoded is printed as-is"""
+        csv_file = create_burp_csv_file([{'ID': '0', 'Host': 'example.com', 'Status code': '200'}])
+        with open(csv_file, 'a') as f:
+            f.write('1,,,,,example.org,,,200,,,,GET / index!,plain response!\n')
+
+        burp_log_parser.decode_burp_log(csv_file, None, None, None, False, False)
+        captured = capsys.readouterr()
+        os.unlink(csv_file)
+
+        assert "GET / index!" in captured.out
+        assert "plain response!" in captured.out
+
     def test_status_code_filter(self, csv_file, capsys):
         """Test filtering by status code"""
         # Should show results for 200
@@ -145,6 +238,89 @@ Hello, World!"""
         captured = capsys.readouterr()
         assert "Host: example.com" not in captured.out
 
+    def test_multiple_response_filters(self, csv_file, capsys):
+        """Test comma-separated positive and negative response filters"""
+        # Any matching pattern should keep the entry
+        burp_log_parser.decode_burp_log(csv_file, None, "Goodbye, Hel+o", None, False, False)
+        captured = capsys.readouterr()
+        assert "Host: example.com" in captured.out
+
+        # Any matching negative pattern should drop the entry
+        burp_log_parser.decode_burp_log(csv_file, None, None, "Goodbye,World", False, False)
+        captured = capsys.readouterr()
+        assert "Host: example.com" not in captured.out
+
+    def test_compile_filter(self):
+        """Test compiled filters match raw bytes against any of the comma-separated patterns"""
+        assert burp_log_parser.compile_filter(None) is None
+
+        matches = burp_log_parser.compile_filter("error, exception")
+        assert matches(b"an exception occurred")
+        assert not matches(b"all good")
+
+        # Backreferences are not supported by re2 and must still work
+        matches = burp_log_parser.compile_filter(r"(ab)\1")
+        assert matches(b"xxababxx")
+        assert not matches(b"xxabxx")
+
+        # Literal and regex patterns can be mixed
+        matches = burp_log_parser.compile_filter("plain text, [0-9]{3} error")
+        assert matches(b"some plain text here")
+        assert matches(b"got a 500 error")
+        assert not matches(b"got an error")
+
+        # '.' matches across lines of multiline bodies
+        matches = burp_log_parser.compile_filter("<h1>.*</h1>")
+        assert matches(b"<h1>Database\nError</h1>")
+
+        # Empty patterns are ignored
+        assert burp_log_parser.compile_filter(" , ") is None
+        assert burp_log_parser.split_patterns("error, ,error,Error") == [b"error", b"Error"]
+
+        # Regexes work on characters, not bytes
+        body = "Välkommen till Bjärred".encode('utf-8')
+        assert burp_log_parser.compile_filter("Bj.rred")(body)
+        assert burp_log_parser.compile_filter("Bj[äa]rred")(body)
+        assert burp_log_parser.compile_filter(r"V\w+kommen")(body)
+        assert not burp_log_parser.compile_filter(r"Bj..rred")(body)
+
+        # Non-ASCII patterns match their UTF-8 encoding
+        matches = burp_log_parser.compile_filter("Bjärred")
+        assert matches("Välkommen till Bjärred".encode('utf-8'))
+
+    @pytest.mark.parametrize('use_re2', [True, False])
+    def test_compile_filter_non_utf8_body(self, monkeypatch, use_re2):
+        """Test regex filters match bodies that are not valid UTF-8 the same way with and without re2"""
+        if use_re2 and burp_log_parser.re2 is None:
+            pytest.skip("google-re2 is not installed")
+        if not use_re2:
+            monkeypatch.setattr(burp_log_parser, 're2', None)
+
+        matches = burp_log_parser.compile_filter("err.r")
+        assert matches(b"\xff\xfeerr\xffr")
+        assert not matches(b"\xff\xfeerr\xff")
+
+    def test_compile_filter_literals_skip_regex(self, monkeypatch):
+        """Test that plain text patterns are matched without compiling any regex"""
+        def _compile_regex_filter(patterns):
+            assert patterns == []
+            return None
+
+        monkeypatch.setattr(burp_log_parser, 'compile_regex_filter', _compile_regex_filter)
+
+        matches = burp_log_parser.compile_filter("Database Error, api_key")
+        assert matches(b"<h1>Database Error</h1>")
+        assert matches(b'{"api_key": "sk-1234"}')
+        assert not matches(b"Database error")
+
+    def test_compile_filter_without_re2(self, monkeypatch):
+        """Test filters fall back to the re module when re2 is unavailable"""
+        monkeypatch.setattr(burp_log_parser, 're2', None)
+
+        matches = burp_log_parser.compile_filter("Hel+o")
+        assert matches(b"Hello, World!")
+        assert not matches(b"Goodbye")
+
     def test_response_only_mode(self, csv_file, capsys):
         """Test response-only output mode"""
         burp_log_parser.decode_burp_log(csv_file, None, None, None, True, False)
@@ -156,6 +332,22 @@ Hello, World!"""
         assert "GET /test HTTP/1.1" not in captured.out
         assert "ID:" not in captured.out
 
+    def test_response_only_skips_request_decoding(self, csv_file, monkeypatch, capsys):
+        """Test that response-only mode only base64-decodes the response"""
+        decoded = []
+        b64decode = burp_log_parser.base64.b64decode
+
+        def _b64decode(data, *args, **kwargs):
+            decoded.append(data)
+            return b64decode(data, *args, **kwargs)
+
+        monkeypatch.setattr(burp_log_parser.base64, 'b64decode', _b64decode)
+        burp_log_parser.decode_burp_log(csv_file, None, None, None, True, False)
+        capsys.readouterr()
+
+        assert len(decoded) == 1
+        assert b"Hello, World!" in b64decode(decoded[0])
+
     def test_json_output(self, csv_file, capsys):
         """Test JSON output format"""
         burp_log_parser.decode_burp_log(csv_file, None, None, None, False, True)
@@ -169,6 +361,129 @@ Hello, World!"""
         assert "GET /test HTTP/1.1" in data[0]['Decoded HTTP Request']
         assert "Hello, World!" in data[0]['Decoded HTTP Response']
 
+    @pytest.fixture
+    def reload_parser(self, monkeypatch):
+        """Reloads the parser module so import-time settings pick up the environment, restoring it afterwards"""
+        yield lambda: importlib.reload(burp_log_parser)
+        monkeypatch.undo()
+        importlib.reload(burp_log_parser)
+
+    def test_no_color_when_piped(self, csv_file, monkeypatch, reload_parser, capsys):
+        """Test that output which is not a terminal has no ANSI escapes"""
+        monkeypatch.delenv('FORCE_COLOR', raising=False)
+        monkeypatch.delenv('NO_COLOR', raising=False)
+        reload_parser()
+
+        assert burp_log_parser.USE_COLOR is False
+        burp_log_parser.decode_burp_log(csv_file, None, None, None, False, False)
+        captured = capsys.readouterr()
+        assert "Hello, World!" in captured.out
+        assert "\x1b[" not in captured.out
+
+    def test_force_color(self, csv_file, monkeypatch, reload_parser, capsys):
+        """Test that FORCE_COLOR colorizes output even when it is not a terminal"""
+        monkeypatch.setenv('FORCE_COLOR', '1')
+        monkeypatch.delenv('NO_COLOR', raising=False)
+        reload_parser()
+
+        assert burp_log_parser.USE_COLOR is True
+        burp_log_parser.decode_burp_log(csv_file, None, None, None, False, False)
+        assert "\x1b[" in capsys.readouterr().out
+
+    def test_no_color_env(self, monkeypatch, reload_parser):
+        """Test that NO_COLOR disables colors even for a terminal"""
+        monkeypatch.delenv('FORCE_COLOR', raising=False)
+        monkeypatch.setenv('NO_COLOR', '1')
+        monkeypatch.setattr(sys.stdout, 'isatty', lambda: True, raising=False)
+        reload_parser()
+
+        assert burp_log_parser.USE_COLOR is False
+        assert burp_log_parser.colored is burp_log_parser.plain
+
+    def test_json_output_csv_schema(self, capsys):
+        """Test JSON entries from a CSV have a fixed set of fields regardless of the columns present"""
+        request_b64 = base64.b64encode(b"GET / HTTP/1.1").decode()
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write(f'ID,Host,Status code,Extra,Request\n0,example.com,200,ignored,{request_b64}\n')
+        try:
+            burp_log_parser.decode_burp_log(f.name, None, None, None, False, True)
+        finally:
+            os.unlink(f.name)
+        data = json.loads(capsys.readouterr().out)
+
+        assert list(data[0]) == ['ID', 'Time', 'Tool', 'Method', 'Protocol', 'Host', 'Port', 'URL', 'Status Code',
+                                 'Length', 'MIME Type', 'Comment', 'Decoded HTTP Request', 'Decoded HTTP Response']
+        assert data[0]['Host'] == 'example.com'
+        assert data[0]['Time'] is None
+        assert data[0]['Decoded HTTP Request'] == 'GET / HTTP/1.1'
+
+    def test_json_output_no_matches(self, csv_file, capsys):
+        """Test JSON output is an empty array when nothing matches"""
+        burp_log_parser.decode_burp_log(csv_file, "404", None, None, False, True)
+        captured = capsys.readouterr()
+
+        assert json.loads(captured.out) == []
+
+    @pytest.mark.parametrize('json_output', [False, True])
+    def test_malformed_xml_exits(self, capsys, json_output):
+        """Test that a malformed XML log is reported as a parse error without any output"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as f:
+            f.write('<?xml version="1.0"?>\n<items><item><host>example.com</item>')
+        try:
+            with pytest.raises(SystemExit):
+                burp_log_parser.decode_burp_log(f.name, None, None, None, False, json_output)
+        finally:
+            os.unlink(f.name)
+        captured = capsys.readouterr()
+        assert "Error parsing file" in captured.err
+        assert captured.out == ""
+
+    def test_truncated_xml_json_output(self, sample_xml_content, capsys):
+        """Test that JSON output stays valid when the log is truncated after a complete item"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as f:
+            f.write(sample_xml_content.replace('</items>', '<item><host>truncated.example.com</host>'))
+        try:
+            with pytest.raises(SystemExit):
+                burp_log_parser.decode_burp_log(f.name, None, None, None, False, True)
+        finally:
+            os.unlink(f.name)
+        captured = capsys.readouterr()
+
+        assert "Error parsing file" in captured.err
+        data = json.loads(captured.out)
+        assert [entry['Host'] for entry in data] == ['example.com']
+
+    def test_missing_file_exits(self, capsys):
+        """Test that a missing log file is reported without any JSON output"""
+        with pytest.raises(SystemExit):
+            burp_log_parser.decode_burp_log('/nonexistent/log.csv', None, None, None, False, True)
+        captured = capsys.readouterr()
+        assert "Error parsing file" in captured.err
+        assert captured.out == ""
+
+    def test_workers(self, create_burp_csv_file, monkeypatch, capsys):
+        """Test decoding with worker processes keeps the entries in order"""
+        monkeypatch.setattr(burp_log_parser, 'WORKER_CHUNKSIZE', 1)
+        csv_file = create_burp_csv_file([
+            {'ID': str(i), 'Host': 'example.com', 'Status code': '200',
+             'Request': f'GET /{i} HTTP/1.1', 'Response': 'HTTP/1.1 200 OK' if i % 3 else 'HTTP/1.1 500 Error'}
+            for i in range(20)
+        ])
+        try:
+            burp_log_parser.decode_burp_log(csv_file, None, None, "500 Error", False, True, workers=2)
+        finally:
+            os.unlink(csv_file)
+        data = json.loads(capsys.readouterr().out)
+
+        assert [entry['ID'] for entry in data] == [str(i) for i in range(20) if i % 3]
+        assert data[0]['Decoded HTTP Request'] == 'GET /1 HTTP/1.1'
+
+    def test_workers_invalid_pattern(self, csv_file, capsys):
+        """Test an invalid filter pattern raises its own error before any worker is started"""
+        with pytest.raises(re.error):
+            burp_log_parser.decode_burp_log(csv_file, None, "(", None, False, True, workers=2)
+        assert capsys.readouterr().out == ""
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])